@@ -182,14 +182,15 @@ def _check_field(
     expected,
     actual,
     detail: Optional[str] = None,
-) -> None:
-    """Compare a single manifest field and record the result."""
+) -> CheckStatus:
+    """Compare a single manifest field, record the result and return its status."""
     exp_str = str(expected)
     act_str = str(actual)
     status = CheckStatus.PASS if exp_str == act_str else CheckStatus.FAIL
     report.add(
         CheckResult(name=name, status=status, expected=exp_str, actual=act_str, detail=detail)
     )
+    return status
 
 
 def _load_manifest(manifest_path: Path) -> dict:
@@ -345,15 +346,26 @@ def verify_preprocessing(
 
     report.add(CheckResult(name="raw_file_exists", status=CheckStatus.PASS))
 
-    # SHA256 of raw file
-    raw_sha256_actual = utils.compute_sha256(file_path=input_dump)
-    _check_field(
-        report,
-        "raw_sha256",
-        expected=manifest.get("raw_sha256"),
-        actual=raw_sha256_actual,
-        detail="SHA256 of the raw input dump",
-    )
+    # A size mismatch already proves the raw file differs, so don't spend
+    # a full hashing pass (and a re-run of preprocessing) to confirm it
+    if "raw_size_bytes" in manifest:
+        raw_size_status = _check_field(
+            report,
+            "raw_size_bytes",
+            expected=manifest["raw_size_bytes"],
+            actual=input_dump.stat().st_size,
+            detail="Size of the raw input dump in bytes",
+        )
+        if raw_size_status == CheckStatus.FAIL:
+            return report
+    else:
+        report.add(
+            CheckResult(
+                name="raw_size_bytes",
+                status=CheckStatus.SKIP,
+                detail="Field absent from manifest (older version)",
+            )
+        )
 
     # Shared Merkle chunk size validation
     chunk_size = manifest.get("chunk_size_bytes", utils.MERKLE_CHUNK_SIZE_BYTES)
@@ -371,9 +383,22 @@ def verify_preprocessing(
         )
         return report
 
-    # Merkle root of raw file
+    # SHA256 and Merkle root of raw file, from a single read when both are needed
+    if "raw_merkle_root" in manifest:
+        raw_sha256_actual, raw_merkle_actual = utils.compute_sha256_and_merkle_root(
+            input_dump, chunk_size=chunk_size
+        )
+    else:
+        raw_sha256_actual = utils.compute_sha256(file_path=input_dump)
+    _check_field(
+        report,
+        "raw_sha256",
+        expected=manifest.get("raw_sha256"),
+        actual=raw_sha256_actual,
+        detail="SHA256 of the raw input dump",
+    )
+
     if "raw_merkle_root" in manifest:
-        raw_merkle_actual = utils.compute_merkle_root(input_dump, chunk_size=chunk_size)
         _check_field(
             report,
             "raw_merkle_root",
@@ -528,38 +553,58 @@ def verify_preprocessing(
         )
 
         # 5. Compare reproduced processed file against manifest
-
-        # SHA256 of reproduced processed file
-        proc_sha256_actual = utils.compute_sha256(file_path=reproduced_processed)
-        _check_field(
-            report,
-            "processed_sha256",
-            expected=manifest.get("processed_sha256"),
-            actual=proc_sha256_actual,
-            detail="SHA256 of reproduced wiki_clean.txt",
-        )
-
-        # Merkle root of reproduced processed file
-        if "processed_merkle_root" in manifest:
-            proc_merkle_actual = utils.compute_merkle_root(
-                reproduced_processed, chunk_size=chunk_size
-            )
-            _check_field(
+        if "processed_size_bytes" in manifest:
+            processed_size_status = _check_field(
                 report,
-                "processed_merkle_root",
-                expected=manifest["processed_merkle_root"],
-                actual=proc_merkle_actual,
-                detail=f"Merkle root of reproduced processed file (chunk={chunk_size} bytes)",
+                "processed_size_bytes",
+                expected=manifest["processed_size_bytes"],
+                actual=reproduced_processed.stat().st_size,
+                detail="Size of reproduced wiki_clean.txt in bytes",
             )
         else:
+            processed_size_status = CheckStatus.SKIP
             report.add(
                 CheckResult(
-                    name="processed_merkle_root",
-                    status=CheckStatus.SKIP,
+                    name="processed_size_bytes",
+                    status=processed_size_status,
                     detail="Field absent from manifest (older version)",
                 )
             )
 
+        # Hashing can only confirm a size mismatch, so only hash when sizes agree
+        if processed_size_status != CheckStatus.FAIL:
+            # SHA256 and Merkle root of reproduced processed file, in one read
+            if "processed_merkle_root" in manifest:
+                proc_sha256_actual, proc_merkle_actual = utils.compute_sha256_and_merkle_root(
+                    reproduced_processed, chunk_size=chunk_size
+                )
+            else:
+                proc_sha256_actual = utils.compute_sha256(file_path=reproduced_processed)
+            _check_field(
+                report,
+                "processed_sha256",
+                expected=manifest.get("processed_sha256"),
+                actual=proc_sha256_actual,
+                detail="SHA256 of reproduced wiki_clean.txt",
+            )
+
+            if "processed_merkle_root" in manifest:
+                _check_field(
+                    report,
+                    "processed_merkle_root",
+                    expected=manifest["processed_merkle_root"],
+                    actual=proc_merkle_actual,
+                    detail=f"Merkle root of reproduced processed file (chunk={chunk_size} bytes)",
+                )
+            else:
+                report.add(
+                    CheckResult(
+                        name="processed_merkle_root",
+                        status=CheckStatus.SKIP,
+                        detail="Field absent from manifest (older version)",
+                    )
+                )
+
         # 6. Compare reproduced manifest fields
         reproduced_manifest_path = tmp_dir / "data" / "dataset_manifest.json"
         if reproduced_manifest_path.exists():
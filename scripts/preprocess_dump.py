@@ -23,11 +23,18 @@ def main():
         help="Skip manifest generation",
     )
 
+    parser.add_argument(
+        "--safe-xml",
+        action="store_true",
+        help="Parse with defusedxml even if lxml is installed",
+    )
+
     args = parser.parse_args()
 
     extract_text_from_xml(
         Path(args.input_dump),
         write_manifest=not args.no_manifest,
+        safe_xml=args.safe_xml,
     )
 
 
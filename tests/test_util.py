@@ -1,6 +1,9 @@
 import bz2
 import hashlib
 import json
+import os
+import shutil
+import threading
 
 import pytest
 
@@ -35,6 +38,12 @@ def test_clean_wikitext_collapses_whitespace():
     assert cleaned == "Hello world test"
 
 
+def test_clean_wikitext_collapses_unicode_whitespace():
+    text = "　Hello\xa0\x0c world "
+    cleaned = utils.clean_wikitext(text)
+    assert cleaned == "Hello world"
+
+
 # --------------- extract_dump_date tests ------------------------------------
 
 
@@ -93,6 +102,18 @@ def test_compute_sha256_bytes(tmp_path):
     assert actual_file == expected
 
 
+def test_compute_sha256_bytes_without_file_digest(tmp_path, monkeypatch):
+    file = tmp_path / "sample.bin"
+    content = bytes(range(256)) * 5000
+    file.write_bytes(content)
+
+    # Exercise the readinto loop used on Pythons before 3.11
+    monkeypatch.delattr(hashlib, "file_digest", raising=False)
+    monkeypatch.setattr(utils, "HASH_READ_BUFFER_BYTES", 1000)
+
+    assert utils.compute_sha256_bytes(file_path=file) == hashlib.sha256(content).digest()
+
+
 def test_correct_sha256_output(tmp_path):
     file = tmp_path / "sample.txt"
     content = "hello wikipedia"
@@ -124,8 +145,7 @@ def test_file_not_found():
 # --------------- extract_text_from_xml tests ------------------------------------
 
 
-def test_extract_text_from_xml_end_to_end(tmp_path, monkeypatch):
-    xml_content = """<?xml version="1.0"?>
+SAMPLE_XML_CONTENT = """<?xml version="1.0"?>
     <mediawiki>
       <page>
         <revision>
@@ -135,10 +155,19 @@ def test_extract_text_from_xml_end_to_end(tmp_path, monkeypatch):
     </mediawiki>
     """
 
-    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
 
-    with bz2.open(input_file, "wt", encoding="utf-8") as f:
-        f.write(xml_content)
+@pytest.fixture(scope="session")
+def sample_bz2(tmp_path_factory):
+    """Compress SAMPLE_XML_CONTENT once; tests copy it into their own tmp_path."""
+    path = tmp_path_factory.mktemp("data") / "sample.xml.bz2"
+    with bz2.open(path, "wt", encoding="utf-8") as f:
+        f.write(SAMPLE_XML_CONTENT)
+    return path
+
+
+def test_extract_text_from_xml_end_to_end(tmp_path, monkeypatch, sample_bz2):
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    shutil.copy(sample_bz2, input_file)
 
     monkeypatch.chdir(tmp_path)
 
@@ -177,6 +206,248 @@ def test_extract_text_from_xml_uncompressed(tmp_path, monkeypatch):
     assert "Hello Uncompressed" in processed_file.read_text()
 
 
+def test_iter_clean_pages_matches_extracted_file(tmp_path, monkeypatch):
+    xml_content = """<?xml version="1.0"?>
+    <mediawiki>
+      <page><revision><text>First [[page]]</text></revision></page>
+      <page><revision><text/></revision></page>
+      <page><revision><text>Third {{x}} page</text></revision></page>
+    </mediawiki>
+    """
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    input_file.write_bytes(bz2.compress(xml_content.encode("utf-8")))
+
+    pages = list(utils.iter_clean_pages(input_file))
+    assert pages == ["First page", "", "Third page"]
+    assert list(utils.iter_clean_pages(input_file, skip_pages=2)) == ["Third page"]
+
+    monkeypatch.chdir(tmp_path)
+    utils.extract_text_from_xml(input_file)
+
+    processed_file = tmp_path / "data/processed/wiki_clean.txt"
+    assert processed_file.read_text() == "".join(page + "\n\n" for page in pages if page)
+
+
+def test_extract_text_from_xml_lxml_matches_defusedxml(tmp_path, monkeypatch):
+    pytest.importorskip("lxml")
+
+    xml_content = """<?xml version="1.0"?>
+    <mediawiki xmlns="http://www.mediawiki.org/xml/export-0.11/">
+      <siteinfo><sitename>Wikipedia</sitename></siteinfo>
+      <page>
+        <title>A</title>
+        <revision><text>Hello [[World|Earth]] &amp; {{cite}} friends</text></revision>
+      </page>
+      <page>
+        <title>B</title>
+        <revision><text><![CDATA[<ref>x</ref>Second   page]]></text></revision>
+      </page>
+      <page><title>Empty</title><revision><text/></revision></page>
+    </mediawiki>
+    """
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml"
+    input_file.write_text(xml_content, encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+    processed_file = tmp_path / "data/processed/wiki_clean.txt"
+
+    utils.extract_text_from_xml(input_file, safe_xml=True)
+    expected = processed_file.read_bytes()
+
+    utils.extract_text_from_xml(input_file)
+
+    assert processed_file.read_bytes() == expected
+    assert expected == b"Hello Earth & friends\n\nSecond page\n\n"
+
+
+@pytest.mark.parametrize(
+    "page_xml",
+    [
+        # Longer than libxml2's default 10 MB text node limit
+        "<page><revision><text>" + "x" * 11_000_000 + "</text></revision></page>",
+        # Deeper than libxml2's default 256-level nesting limit
+        "<page><revision><text>deep</text>" + "<d>" * 300 + "</d>" * 300 + "</revision></page>",
+        "<page><revision><text>a<!-- c -->b<?pi x?>c</text></revision></page>",
+        # Every element whose tag ends in "page" counts as a page on both paths
+        "<page><revision><text>a</text></revision></page>"
+        "<subpage><revision><text>zzz</text></revision></subpage>",
+        "<page><revision><text>a</text></revision><subpage><text>zzz</text></subpage></page>"
+        "<page><revision><text>b</text></revision></page>",
+    ],
+    ids=["huge-text", "deep-nesting", "comment-in-text", "subpage", "nested-subpage"],
+)
+def test_iter_clean_pages_lxml_matches_defusedxml_edge_cases(tmp_path, page_xml):
+    pytest.importorskip("lxml")
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml"
+    input_file.write_text(f"<mediawiki>{page_xml}</mediawiki>", encoding="utf-8")
+
+    expected = list(utils.iter_clean_pages(input_file, safe_xml=True))
+
+    assert list(utils.iter_clean_pages(input_file)) == expected
+    assert expected[0]
+
+
+@pytest.mark.parametrize(
+    "xml_content",
+    [
+        # Entity from an external DTD that is never loaded
+        '<?xml version="1.0"?><!DOCTYPE mediawiki SYSTEM "x.dtd">'
+        "<mediawiki><page><revision><text>a&nbsp;b</text></revision></page></mediawiki>",
+        # Entity declared in a dump that has no pages at all
+        '<?xml version="1.0"?><!DOCTYPE mediawiki [<!ENTITY boom "boom">]>'
+        "<mediawiki><siteinfo/></mediawiki>",
+    ],
+    ids=["undefined-entity", "declared-entity-no-pages"],
+)
+def test_iter_clean_pages_lxml_matches_defusedxml_errors(tmp_path, xml_content):
+    pytest.importorskip("lxml")
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml"
+    input_file.write_text(xml_content, encoding="utf-8")
+
+    with pytest.raises(Exception) as expected:
+        list(utils.iter_clean_pages(input_file, safe_xml=True))
+
+    with pytest.raises(type(expected.value)):
+        list(utils.iter_clean_pages(input_file))
+
+
+@pytest.mark.parametrize("safe_xml", [False, True])
+def test_extract_text_from_xml_rejects_entity_declarations(tmp_path, monkeypatch, safe_xml):
+    from defusedxml import EntitiesForbidden
+
+    xml_content = """<?xml version="1.0"?>
+    <!DOCTYPE mediawiki [<!ENTITY boom "boom">]>
+    <mediawiki><page><revision><text>&boom;</text></revision></page></mediawiki>
+    """
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml"
+    input_file.write_text(xml_content, encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(EntitiesForbidden):
+        utils.extract_text_from_xml(input_file, safe_xml=safe_xml)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_extract_text_from_xml_corrupt_bz2_raises(tmp_path, monkeypatch, parallel):
+    if parallel:
+        pytest.importorskip("indexed_bzip2")
+    else:
+        monkeypatch.setattr(utils, "indexed_bzip2", None)
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    input_file.write_bytes(b"BZh9" + b"\x00" * 64)
+
+    monkeypatch.chdir(tmp_path)
+
+    # Decompression errors raised on the read-ahead thread reach the caller
+    with pytest.raises(OSError):
+        utils.extract_text_from_xml(input_file)
+
+
+def test_extract_text_from_xml_parallel_bz2_matches_stdlib(tmp_path, monkeypatch):
+    pytest.importorskip("indexed_bzip2")
+
+    pages = "".join(
+        f"<page><revision><text>Page {i} [[link|text]] {'x' * i}</text></revision></page>"
+        for i in range(500)
+    )
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    # Two concatenated streams, as in Wikipedia's multistream dumps
+    input_file.write_bytes(
+        bz2.compress(f"<mediawiki>{pages[: len(pages) // 2]}".encode())
+        + bz2.compress(f"{pages[len(pages) // 2 :]}</mediawiki>".encode())
+    )
+
+    monkeypatch.chdir(tmp_path)
+    processed_file = tmp_path / "data/processed/wiki_clean.txt"
+
+    utils.extract_text_from_xml(input_file)
+    parallel = processed_file.read_bytes()
+
+    monkeypatch.setattr(utils, "indexed_bzip2", None)
+    utils.extract_text_from_xml(input_file)
+
+    assert parallel == processed_file.read_bytes()
+
+
+def test_extract_text_from_xml_parallel_bz2_corrupt_block_raises(tmp_path, monkeypatch):
+    pytest.importorskip("indexed_bzip2")
+
+    compressed = bytearray(bz2.compress(bytes(range(256)) * 4000))
+    for i in range(len(compressed) // 2, len(compressed) // 2 + 16):
+        compressed[i] ^= 0xFF
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    input_file.write_bytes(bytes(compressed))
+
+    monkeypatch.chdir(tmp_path)
+
+    with pytest.raises(OSError):
+        utils.extract_text_from_xml(input_file)
+
+
+def test_parallel_bz2_reader_checks_empty_output(tmp_path):
+    pytest.importorskip("indexed_bzip2")
+
+    empty = tmp_path / "empty.bz2"
+    empty.write_bytes(bz2.compress(b""))
+    non_empty = tmp_path / "non_empty.bz2"
+    non_empty.write_bytes(bz2.compress(b"<mediawiki/>"))
+    corrupt = tmp_path / "corrupt.bz2"
+    corrupt.write_bytes(b"BZh9" + b"\x00" * 64)
+
+    class NoOutput:
+        # Stands in for indexed_bzip2 versions that decode bad input as empty
+        def readinto(self, buffer):
+            return 0
+
+        def close(self):
+            pass
+
+    def reader_without_output(path):
+        reader = utils._ParallelBz2Reader(path)
+        reader._file.close()
+        reader._file = NoOutput()
+        return reader
+
+    with utils._ParallelBz2Reader(empty) as reader:
+        assert reader.read() == b""
+
+    with reader_without_output(empty) as reader:
+        assert reader.read() == b""
+
+    with pytest.raises(OSError), reader_without_output(corrupt) as reader:
+        reader.read()
+
+    # A valid stream with content must not pass for an empty one
+    with pytest.raises(OSError), reader_without_output(non_empty) as reader:
+        reader.read()
+
+
+@pytest.mark.parametrize("parallel, error", [(False, EOFError), (True, OSError)])
+def test_extract_text_from_xml_truncated_bz2_raises(tmp_path, monkeypatch, parallel, error):
+    if parallel:
+        pytest.importorskip("indexed_bzip2")
+    else:
+        monkeypatch.setattr(utils, "indexed_bzip2", None)
+
+    pages = "".join(f"<page><revision><text>Page {i}</text></revision></page>" for i in range(500))
+    input_file = tmp_path / "simplewiki-20260201-pages.xml.bz2"
+    input_file.write_bytes(bz2.compress(f"<mediawiki>{pages}</mediawiki>".encode())[:-40])
+
+    monkeypatch.chdir(tmp_path)
+
+    # indexed_bzip2 cannot tell truncation from corruption, so both are OSError
+    with pytest.raises(error):
+        utils.extract_text_from_xml(input_file)
+
+
 # --------------- manifest includes merkle fields ------------------------------------
 
 
@@ -269,6 +540,153 @@ def test_compute_merkle_root_multi_chunk_hardcoded(tmp_path):
     assert actual_root == expected_root
 
 
+def test_merkle_root_parallel_matches_serial(tmp_path, monkeypatch):
+    file = tmp_path / "data.bin"
+    file.write_bytes(bytes(range(256)) * 41)
+
+    serial_root = utils.compute_merkle_root(file, chunk_size=64)
+    serial_proof = utils.generate_merkle_proof(file, chunk_index=7, chunk_size=64)
+
+    monkeypatch.setattr(utils, "MERKLE_PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(utils, "MERKLE_PARALLEL_MIN_CHUNK_BYTES", 0)
+
+    assert utils.compute_merkle_root(file, chunk_size=64) == serial_root
+    assert utils.generate_merkle_proof(file, chunk_index=7, chunk_size=64) == serial_proof
+
+
+@pytest.mark.parametrize("error", [OSError, ValueError, OverflowError])
+@pytest.mark.parametrize("content", [b"", b"small file", bytes(range(256)) * 41])
+def test_merkle_root_unmappable_file_falls_back_to_reads(tmp_path, monkeypatch, error, content):
+    file = tmp_path / "data.bin"
+    file.write_bytes(content)
+    mapped = utils.compute_sha256_and_merkle_root(file, chunk_size=64)
+    mapped_proof = (
+        utils.generate_merkle_proof(file, chunk_index=0, chunk_size=64) if content else None
+    )
+
+    def unmappable(*args, **kwargs):
+        raise error("cannot map")
+
+    monkeypatch.setattr(utils.mmap, "mmap", unmappable)
+
+    assert utils.compute_sha256_and_merkle_root(file, chunk_size=64) == mapped
+    if content:
+        assert utils.generate_merkle_proof(file, chunk_index=0, chunk_size=64) == mapped_proof
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="requires named pipes")
+def test_merkle_root_of_fifo(tmp_path):
+    content = bytes(range(256)) * 41
+    regular = tmp_path / "data.bin"
+    regular.write_bytes(content)
+    fifo = tmp_path / "data.fifo"
+    os.mkfifo(fifo)
+
+    def feed():
+        with open(fifo, "wb") as f:
+            # Small writes make the reader see short reads mid-chunk
+            for start in range(0, len(content), 100):
+                f.write(content[start : start + 100])
+                f.flush()
+
+    writer = threading.Thread(target=feed)
+    writer.start()
+    try:
+        root = utils.compute_merkle_root(fifo, chunk_size=64)
+    finally:
+        writer.join()
+
+    assert root == utils.compute_merkle_root(regular, chunk_size=64)
+
+
+def test_merkle_root_small_chunks_stay_serial(tmp_path, monkeypatch):
+    file = tmp_path / "data.bin"
+    file.write_bytes(bytes(range(256)) * 41)
+    serial_root = utils.compute_merkle_root(file, chunk_size=64)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("chunks below MERKLE_PARALLEL_MIN_CHUNK_BYTES must not use the pool")
+
+    monkeypatch.setattr(utils, "MERKLE_PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(utils, "ThreadPoolExecutor", no_pool)
+
+    assert utils.compute_merkle_root(file, chunk_size=64) == serial_root
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+@pytest.mark.parametrize("content", [b"", b"small file", bytes(range(256)) * 41])
+def test_sha256_and_merkle_root_single_pass(tmp_path, monkeypatch, parallel, content):
+    file = tmp_path / "data.bin"
+    file.write_bytes(content)
+
+    if parallel:
+        monkeypatch.setattr(utils, "MERKLE_PARALLEL_MIN_BYTES", 0)
+        monkeypatch.setattr(utils, "MERKLE_PARALLEL_MIN_CHUNK_BYTES", 0)
+
+    assert utils.compute_sha256_and_merkle_root(file, chunk_size=64) == (
+        hashlib.sha256(content).hexdigest(),
+        utils.compute_merkle_root(file, chunk_size=64),
+    )
+
+
+@pytest.mark.parametrize("size", [0, 1, 7, 8, 9, 24, 65, 200])
+def test_merkle_root_builder_matches_file_root(tmp_path, size):
+    file = tmp_path / "data.bin"
+    content = bytes(i % 251 for i in range(size))
+    file.write_bytes(content)
+
+    builder = utils.MerkleRootBuilder(chunk_size=8)
+    # Uneven pieces straddle chunk boundaries
+    for start in range(0, size, 5):
+        builder.update(content[start : start + 5])
+
+    assert builder.hexdigest() == utils.compute_merkle_root(file, chunk_size=8)
+
+
+def test_merkle_root_builder_hexdigest_does_not_finalize(tmp_path):
+    prefix = tmp_path / "prefix.bin"
+    prefix.write_bytes(b"abcdefghij")
+    full = tmp_path / "full.bin"
+    full.write_bytes(b"abcdefghij" * 3)
+
+    builder = utils.MerkleRootBuilder(chunk_size=8)
+    builder.update(b"abcdefghij")
+    assert builder.hexdigest() == utils.compute_merkle_root(prefix, chunk_size=8)
+
+    builder.update(b"abcdefghij" * 2)
+    assert builder.hexdigest() == utils.compute_merkle_root(full, chunk_size=8)
+
+
+def test_merkle_root_builder_reproduces_processed_root(tmp_path, monkeypatch):
+    xml_content = """<?xml version="1.0"?>
+    <mediawiki>
+      <page><revision><text>First [[page]]</text></revision></page>
+      <page><revision><text/></revision></page>
+      <page><revision><text>Third {{x}} page, a little longer</text></revision></page>
+    </mediawiki>
+    """
+
+    input_file = tmp_path / "simplewiki-20260201-pages.xml"
+    input_file.write_text(xml_content, encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+    utils.extract_text_from_xml(input_file, write_manifest=True)
+    manifest = json.loads((tmp_path / "data/dataset_manifest.json").read_text())
+    processed_file = tmp_path / "data/processed/wiki_clean.txt"
+
+    def streamed_root(chunk_size):
+        builder = utils.MerkleRootBuilder(chunk_size=chunk_size)
+        for page in utils.iter_clean_pages(input_file):
+            if page:
+                builder.update(page.encode("utf-8"))
+                builder.update(utils.PAGE_SEPARATOR)
+        return builder.hexdigest()
+
+    assert streamed_root(manifest["chunk_size_bytes"]) == manifest["processed_merkle_root"]
+    # Small chunks exercise a multi-level tree
+    assert streamed_root(8) == utils.compute_merkle_root(processed_file, chunk_size=8)
+
+
 # --------------- Merkle proof generation ------------------------------------
 
 
@@ -294,6 +712,41 @@ def test_merkle_proof_verification(tmp_path):
     bad_proof[0] = ("00" * 32, proof[0][1])
     assert not utils.verify_merkle_proof(chunk, bad_proof, root)
 
+    for bad_sibling in ("00" * 31, "zz" * 32, "00" * 31 + "  "):
+        bad_proof[0] = (bad_sibling, proof[0][1])
+        assert not utils.verify_merkle_proof(chunk, bad_proof, root)
+
+
+@pytest.mark.parametrize("chunk_count", [1, 2, 3, 5, 8, 9])
+def test_merkle_tree_proves_every_chunk(tmp_path, chunk_count):
+    file = tmp_path / "data.bin"
+    content = bytes(range(chunk_count * 8))
+    file.write_bytes(content)
+
+    tree = utils.MerkleTree(file, chunk_size=8)
+
+    assert tree.leaf_count == chunk_count
+    assert tree.root == utils.compute_merkle_root(file, chunk_size=8)
+
+    for index in range(chunk_count):
+        proof = tree.proof(index)
+        chunk = content[index * 8 : (index + 1) * 8]
+        assert utils.verify_merkle_proof(chunk, proof, tree.root)
+
+    with pytest.raises(IndexError):
+        tree.proof(chunk_count)
+
+
+def test_merkle_tree_empty_file(tmp_path):
+    file = tmp_path / "empty.bin"
+    file.write_bytes(b"")
+
+    tree = utils.MerkleTree(file)
+
+    assert tree.root == hashlib.sha256(b"").hexdigest()
+    with pytest.raises(ValueError):
+        tree.proof(0)
+
 
 def test_export_and_load_merkle_proof(tmp_path):
     file = tmp_path / "data.txt"
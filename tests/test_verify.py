@@ -16,6 +16,7 @@ import shutil
 import tempfile
 import unittest
 from pathlib import Path
+from unittest import mock
 
 from openverifiablellm import utils
 from openverifiablellm.verify import (
@@ -258,6 +259,17 @@ class TestHappyPath(TmpMixin):
         r = verify_preprocessing(self.dump, project_root=self.tmp)
         self.assertEqual(r.input_dump, str(self.dump))
 
+    def test_each_file_hashed_in_a_single_pass(self):
+        # SHA256 and Merkle root both come from compute_sha256_and_merkle_root
+        with (
+            mock.patch.object(
+                utils, "compute_merkle_root", side_effect=AssertionError("second read")
+            ),
+            mock.patch.object(utils, "compute_sha256", side_effect=AssertionError("second read")),
+        ):
+            r = verify_preprocessing(self.dump, project_root=self.tmp)
+        self.assertTrue(r.all_passed, r.summary())
+
 
 # Integration: failure scenarios
 
@@ -341,6 +353,29 @@ class TestFailureScenarios(TmpMixin):
         c = next(x for x in r.checks if x.name == "raw_merkle_root")
         self.assertEqual(c.status, CheckStatus.FAIL)
 
+    def test_fails_fast_when_raw_size_differs(self):
+        td = Path(tempfile.mkdtemp())
+        try:
+            extended = td / self.dump.name
+            extended.write_bytes(self.dump.read_bytes() + b"EXTRA")
+            r = verify_preprocessing(extended, project_root=self.tmp)
+            c = next(x for x in r.checks if x.name == "raw_size_bytes")
+            self.assertEqual(c.status, CheckStatus.FAIL)
+            names = {x.name for x in r.checks}
+            self.assertNotIn("raw_sha256", names)
+            self.assertNotIn("reprocessing_succeeded", names)
+        finally:
+            shutil.rmtree(td)
+
+    def test_fails_when_processed_size_wrong_in_manifest(self):
+        m = self._read_manifest()
+        m["processed_size_bytes"] += 1
+        self._write_manifest(m)
+        r = verify_preprocessing(self.dump, project_root=self.tmp)
+        c = next(x for x in r.checks if x.name == "processed_size_bytes")
+        self.assertEqual(c.status, CheckStatus.FAIL)
+        self.assertNotIn("processed_sha256", {x.name for x in r.checks})
+
     def test_fails_when_dump_name_differs(self):
         td = Path(tempfile.mkdtemp())
         try:
@@ -361,13 +396,25 @@ class TestLegacyManifest(TmpMixin):
         run_preprocessing(self.tmp, self.dump)
         mp = self.tmp / "data" / "dataset_manifest.json"
         m = json.loads(mp.read_text())
-        for k in ("raw_merkle_root", "processed_merkle_root", "chunk_size_bytes"):
+        for k in (
+            "raw_merkle_root",
+            "processed_merkle_root",
+            "chunk_size_bytes",
+            "raw_size_bytes",
+            "processed_size_bytes",
+        ):
             m.pop(k, None)
         mp.write_text(json.dumps(m, indent=2))
 
     def test_merkle_checks_are_skipped(self):
         r = verify_preprocessing(self.dump, project_root=self.tmp)
-        for name in ("raw_merkle_root", "processed_merkle_root", "manifest_chunk_size_bytes"):
+        for name in (
+            "raw_merkle_root",
+            "processed_merkle_root",
+            "manifest_chunk_size_bytes",
+            "raw_size_bytes",
+            "processed_size_bytes",
+        ):
             c = next((x for x in r.checks if x.name == name), None)
             self.assertIsNotNone(c, f"check '{name}' not found")
             self.assertEqual(c.status, CheckStatus.SKIP)